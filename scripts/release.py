@@ -4,6 +4,8 @@
 # ruff: noqa: E501
 # pylint: disable=broad-exception-caught, line-too-long
 
+import atexit
+import functools
 import re
 import shutil
 import subprocess
@@ -44,9 +46,37 @@ GRADIENT_COLORS = [
     (0, 191, 255),   # DeepSkyBlue
 ]
 
+# Precompiled regular expressions
+_ANSI_RE = re.compile(r"\x1B[@-_][0-?]*[ -/]*[@-~]")
+_VERSION_RE = re.compile(r'version\s*=\s*"(\d+\.\d+\.\d+)"')
+_VERSION_LINE_RE = re.compile(r'^(version\s*=\s*)"(\d+\.\d+\.\d+)"', re.MULTILINE)
+_SEMVER_RE = re.compile(r"^\d+\.\d+\.\d+$")
+
+# Pending terminal output, written to stdout in one go by flush_output()
+_OUTPUT_BUFFER: List[str] = []
+
+def write_output(text: str) -> None:
+    """Queue text for the terminal without writing it yet."""
+    _OUTPUT_BUFFER.append(text)
+
+def flush_output() -> None:
+    """Write all queued output to stdout with a single write call."""
+    if _OUTPUT_BUFFER:
+        sys.stdout.write("".join(_OUTPUT_BUFFER))
+        _OUTPUT_BUFFER.clear()
+    sys.stdout.flush()
+
+atexit.register(flush_output)
+
+def prompt_colored(message: str, color: str) -> str:
+    """Ask for input with a colored prompt, flushing queued output first."""
+    write_output(f"{color}{message}{COLOR_RESET}")
+    flush_output()
+    return input()
+
 def print_colored(message: str, color: str) -> None:
     """Print a message with a specific color."""
-    print(f"{color}{message}{COLOR_RESET}")
+    write_output(f"{color}{message}{COLOR_RESET}\n")
 
 def print_step(step: str) -> None:
     """Print a step in the process with a specific color."""
@@ -69,12 +99,10 @@ def generate_gradient(colors: List[Tuple[int, int, int]], steps: int) -> List[st
     gradient = []
     segments = len(colors) - 1
     steps_per_segment = max(1, steps // segments)
+    ts = [j / steps_per_segment for j in range(steps_per_segment)]
 
-    for i in range(segments):
-        start_color = colors[i]
-        end_color = colors[i + 1]
-        for j in range(steps_per_segment):
-            t = j / steps_per_segment
+    for start_color, end_color in zip(colors, colors[1:]):
+        for t in ts:
             r = int(start_color[0] * (1 - t) + end_color[0] * t)
             g = int(start_color[1] * (1 - t) + end_color[1] * t)
             b = int(start_color[2] * (1 - t) + end_color[2] * t)
@@ -84,19 +112,33 @@ def generate_gradient(colors: List[Tuple[int, int, int]], steps: int) -> List[st
 
 def strip_ansi(text: str) -> str:
     """Remove ANSI color codes from a string."""
-    ansi_escape = re.compile(r"\x1B[@-_][0-?]*[ -/]*[@-~]")
-    return ansi_escape.sub("", text)
-
-def apply_gradient(text: str, gradient: List[str], line_number: int) -> str:
-    """Apply gradient colors diagonally to text."""
-    return "".join(
-        f"{gradient[(i + line_number) % len(gradient)]}{char}"
-        for i, char in enumerate(text)
-    )
+    return _ANSI_RE.sub("", text)
+
+def gradient_parts(text: str, gradient: List[str], line_number: int) -> List[str]:
+    """Split text into color codes and characters forming a diagonal gradient.
+
+    A color code is only emitted when it differs from the last one written,
+    and whitespace inherits whatever color is active since it is invisible.
+    """
+    parts = []
+    last_code = None
+    for i, char in enumerate(text):
+        if not char.isspace():
+            code = gradient[(i + line_number) % len(gradient)]
+            if code != last_code:
+                parts.append(code)
+                last_code = code
+        parts.append(char)
+    return parts
+
+@functools.lru_cache(maxsize=256)
+def visible_width(text: str) -> int:
+    """Return the on-screen width of text, ignoring ANSI color codes."""
+    return wcswidth(strip_ansi(text))
 
 def center_text(text: str, width: int) -> str:
     """Center text, accounting for ANSI color codes and Unicode widths."""
-    visible_length = wcswidth(strip_ansi(text))
+    visible_length = visible_width(text)
     padding = (width - visible_length) // 2
     return f"{' ' * padding}{text}{' ' * (width - padding - visible_length)}"
 
@@ -104,8 +146,12 @@ def center_block(block: List[str], width: int) -> List[str]:
     """Center a block of text within a given width."""
     return [center_text(line, width) for line in block]
 
+@functools.lru_cache(maxsize=None)
 def create_banner() -> str:
-    """Create a beautiful cosmic-themed banner with diagonal gradient."""
+    """Create a beautiful cosmic-themed banner with diagonal gradient.
+
+    The banner only depends on constants, so it is built once and cached.
+    """
     banner_width = 80
     content_width = banner_width - 4  # Accounting for border characters
     cosmic_gradient = generate_gradient(GRADIENT_COLORS, banner_width)
@@ -122,28 +168,30 @@ def create_banner() -> str:
 
     centered_logo = center_block(logo, content_width)
 
-    banner = [
-        center_text(f"{COLOR_STAR}･ ｡ ☆ ∴｡　　･ﾟ*｡★･ ∴｡　　･ﾟ*｡☆ ･ ｡ ☆ ∴｡", banner_width),
-        f"{COLOR_BORDER}╭{'─' * (banner_width - 2)}╮",
+    parts = [
+        center_text(f"{COLOR_STAR}･ ｡ ☆ ∴｡　　･ﾟ*｡★･ ∴｡　　･ﾟ*｡☆ ･ ｡ ☆ ∴｡", banner_width), "\n",
+        f"{COLOR_BORDER}╭{'─' * (banner_width - 2)}╮", "\n",
     ]
 
     for line_number, line in enumerate(centered_logo):
-        gradient_line = apply_gradient(line, cosmic_gradient, line_number)
-        banner.append(f"{COLOR_BORDER}│ {gradient_line} {COLOR_BORDER}│")
+        parts.append(f"{COLOR_BORDER}│ ")
+        parts.extend(gradient_parts(line, cosmic_gradient, line_number))
+        parts.append(f" {COLOR_BORDER}│\n")
 
     release_manager_text = COLOR_STEP + "Release Manager"
 
-    banner.extend([
-        f"{COLOR_BORDER}╰{'─' * (banner_width - 2)}╯",
-        center_text(f"{COLOR_STAR}∴｡　　･ﾟ*｡☆ {release_manager_text}{COLOR_STAR} ☆｡*ﾟ･　 ｡∴", banner_width),
+    parts.extend([
+        f"{COLOR_BORDER}╰{'─' * (banner_width - 2)}╯", "\n",
+        center_text(f"{COLOR_STAR}∴｡　　･ﾟ*｡☆ {release_manager_text}{COLOR_STAR} ☆｡*ﾟ･　 ｡∴", banner_width), "\n",
         center_text(f"{COLOR_STAR}･ ｡ ☆ ∴｡　　･ﾟ*｡★･ ∴｡　　･ﾟ*｡☆ ･ ｡ ☆ ∴｡", banner_width),
     ])
 
-    return "\n".join(banner)
+    return "".join(parts)
 
 def print_logo() -> None:
     """Print the banner/logo for the release manager."""
-    print(create_banner())
+    write_output(create_banner())
+    write_output("\n")
 
 def check_tool_installed(tool_name: str) -> None:
     """Check if a tool is installed."""
@@ -151,63 +199,61 @@ def check_tool_installed(tool_name: str) -> None:
         print_error(f"{tool_name} is not installed. Please install it and try again.")
         sys.exit(1)
 
-def check_branch() -> None:
-    """Ensure we're on the main branch."""
-    current_branch = subprocess.check_output(["git", "rev-parse", "--abbrev-ref", "HEAD"]).decode().strip()
+def check_git_status() -> None:
+    """Ensure we're on the main branch with no uncommitted changes."""
+    status = subprocess.run(
+        ["git", "status", "--porcelain=v2", "--branch", "--untracked-files=no"],
+        capture_output=True, text=True, check=True,
+    ).stdout.splitlines()
+    current_branch = next((line.split(" ", 2)[2] for line in status if line.startswith("# branch.head ")), None)
     if current_branch != "main":
         print_error("You must be on the main branch to release.")
         sys.exit(1)
-
-def check_uncommitted_changes() -> None:
-    """Check for uncommitted changes."""
-    result = subprocess.run(["git", "diff-index", "--quiet", "HEAD", "--"], capture_output=True)
-    if result.returncode != 0:
+    if any(not line.startswith("#") for line in status):
         print_error("You have uncommitted changes. Please commit or stash them before releasing.")
         sys.exit(1)
 
-def get_current_version() -> str:
-    """Get the current version from Cargo.toml."""
+def get_current_version() -> Tuple[str, str]:
+    """Get the current version and the raw contents of Cargo.toml."""
     with open("Cargo.toml", "r") as f:
         content = f.read()
-    match = re.search(r'version\s*=\s*"(\d+\.\d+\.\d+)"', content)
+    match = _VERSION_RE.search(content)
     if match:
-        return match.group(1)
+        return match.group(1), content
     print_error("Could not find version in Cargo.toml")
     sys.exit(1)
 
-def update_version(new_version: str) -> None:
-    """Update the version in Cargo.toml."""
-    with open("Cargo.toml", "r") as f:
-        content = f.read()
-    updated_content = re.sub(r'^(version\s*=\s*)"(\d+\.\d+\.\d+)"', f'\\1"{new_version}"', content, flags=re.MULTILINE)
+def update_version(new_version: str, content: str) -> None:
+    """Update the version in Cargo.toml, given its current contents."""
+    updated_content = _VERSION_LINE_RE.sub(f'\\1"{new_version}"', content)
     with open("Cargo.toml", "w") as f:
         f.write(updated_content)
     print_success(f"Updated version in Cargo.toml to {new_version}")
 
 def run_checks() -> None:
-    """Run cargo check and cargo test."""
-    print_step("Running cargo check")
-    subprocess.run(["cargo", "check"], check=True)
+    """Run cargo test, which also type-checks the whole crate."""
     print_step("Running cargo test")
-    subprocess.run(["cargo", "test"], check=True)
+    flush_output()
+    subprocess.run(["cargo", "test", "--no-fail-fast"], check=True)
     print_success("All checks passed")
 
 def show_changes() -> bool:
     """Show changes and ask for confirmation."""
     print_warning("The following files will be modified:")
+    flush_output()
     subprocess.run(["git", "status", "--porcelain"])
-    confirmation = input(f"{COLOR_VERSION_PROMPT}Do you want to proceed with these changes? (y/N): {COLOR_RESET}").lower()
+    confirmation = prompt_colored("Do you want to proceed with these changes? (y/N): ", COLOR_VERSION_PROMPT).lower()
     return confirmation == "y"
 
 def commit_and_push(version: str) -> None:
     """Commit and push changes to the repository."""
     print_step("Committing and pushing changes")
+    flush_output()
     try:
         subprocess.run(["git", "add", "Cargo.*"], check=True)
         subprocess.run(["git", "commit", "-m", f":rocket: Release version {version}"], check=True)
-        subprocess.run(["git", "push"], check=True)
-        subprocess.run(["git", "tag", f"v{version}"], check=True)
-        subprocess.run(["git", "push", "--tags"], check=True)
+        subprocess.run(["git", "tag", "-a", f"v{version}", "-m", f"Release version {version}"], check=True)
+        subprocess.run(["git", "push", "--follow-tags"], check=True)
         print_success(f"Changes committed and pushed for version {version}")
     except subprocess.CalledProcessError as e:
         print_error(f"Git operations failed: {str(e)}")
@@ -215,7 +261,7 @@ def commit_and_push(version: str) -> None:
 
 def is_valid_version(version: str) -> bool:
     """Validate version format."""
-    return re.match(r"^\d+\.\d+\.\d+$", version) is not None
+    return _SEMVER_RE.match(version) is not None
 
 def main() -> None:
     """Main function to handle the release process."""
@@ -225,17 +271,16 @@ def main() -> None:
     for tool in ["git", "cargo"]:
         check_tool_installed(tool)
 
-    check_branch()
-    check_uncommitted_changes()
+    check_git_status()
 
-    current_version = get_current_version()
-    new_version = input(f"{COLOR_VERSION_PROMPT}Current version is {current_version}. What should the new version be? {COLOR_RESET}")
+    current_version, cargo_toml = get_current_version()
+    new_version = prompt_colored(f"Current version is {current_version}. What should the new version be? ", COLOR_VERSION_PROMPT)
 
     if not is_valid_version(new_version):
         print_error("Invalid version format. Please use semantic versioning (e.g., 1.2.3).")
         sys.exit(1)
 
-    update_version(new_version)
+    update_version(new_version, cargo_toml)
     run_checks()
 
     if not show_changes():